@@ -0,0 +1,55 @@
+"""FFT Backend Setup
+
+librosa 0.11 runs every STFT through scipy.fft; older releases use
+numpy.fft unless told otherwise. scipy.fft (installed with librosa) is
+faster on most platforms, and PyFFTW, when installed, is faster still
+for repeated transforms of the same size because it caches its plans."""
+
+import librosa
+
+# Seconds PyFFTW keeps an unused cached plan alive
+FFTW_KEEPALIVE_SECONDS = 30
+
+# First librosa release that uses scipy.fft by default and deprecates
+# librosa.set_fftlib in favour of scipy.fft's backend mechanism
+SCIPY_FFT_DEFAULT_VERSION = (0, 11)
+
+_CONFIGURED = False
+
+
+def _librosa_version():
+    """librosa's (major, minor) version as integers"""
+    major, minor = librosa.__version__.split(".")[:2]
+    return int(major), int(minor)
+
+
+def configure_fft_backend():
+    """Point librosa at the fastest available FFT library. Only the
+    first call does anything, so every analyzer can call it on import."""
+    global _CONFIGURED  # pylint: disable=global-statement
+    if _CONFIGURED:
+        return
+    _CONFIGURED = True
+
+    # pylint: disable=import-outside-toplevel
+    import scipy.fft
+
+    scipy_default = _librosa_version() >= SCIPY_FFT_DEFAULT_VERSION
+    try:
+        import pyfftw.interfaces.cache
+        import pyfftw.interfaces.scipy_fft
+    except ImportError:
+        # Newer librosa already uses scipy.fft; set_fftlib would only
+        # repeat that and warn about its deprecation
+        if not scipy_default:
+            librosa.set_fftlib(scipy.fft)
+        return
+
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(FFTW_KEEPALIVE_SECONDS)
+    if scipy_default:
+        # Routes librosa's scipy.fft calls (including the MFCC dct)
+        # through PyFFTW
+        scipy.fft.set_global_backend(pyfftw.interfaces.scipy_fft)
+    else:
+        librosa.set_fftlib(pyfftw.interfaces.scipy_fft)
@@ -0,0 +1,40 @@
+"""Compiled DSP Kernels
+
+Per-sample loops compiled with Numba, which is installed with librosa.
+Each kernel is None when numba can't be imported, so callers keep a
+NumPy fallback."""
+
+import math
+
+try:
+    from numba import njit
+except ImportError:  # installed with librosa; callers fall back to NumPy
+    njit = None
+
+# Kernels are serial. Workers run with NUMBA_NUM_THREADS=1 (see
+# parallel.py), so parallel=True would only add threading overhead, and
+# a parallel kernel first called off the main thread (BPM prefetching,
+# Streamlit) can hang the interpreter at exit under the TBB layer.
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def downmix_stereo(left, right, out):
+        """Fused average of two channels into out, one SIMD pass"""
+        for i in range(left.size):
+            out[i] = 0.5 * (left[i] + right[i])
+
+    @njit(cache=True, fastmath=True)
+    def peak_and_rms(y):
+        """Peak absolute level and RMS of a mono signal, in one pass"""
+        if y.size == 0:
+            return 0.0, 0.0
+        peak = 0.0
+        total = 0.0
+        for i in range(y.size):
+            peak = max(peak, abs(y[i]))
+            total += y[i] * y[i]
+        return peak, math.sqrt(total / y.size)
+
+else:
+    downmix_stereo = None
+    peak_and_rms = None
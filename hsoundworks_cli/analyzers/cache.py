@@ -0,0 +1,88 @@
+"""Analysis Cache Module
+
+Stores BPM values and feature matrices under outputs/cache so repeated
+runs over the same files can skip decoding and analysis entirely."""
+
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cache constants
+CACHE_DIR = os.path.join("outputs", "cache")
+# Bump when analysis parameters change so stale entries are ignored
+CACHE_VERSION = 2
+
+
+def _cache_key(file_path):
+    """Build a key from the file's absolute path, size and modification
+    time, so an edited or replaced file never hits a stale entry."""
+    stat = os.stat(file_path)
+    raw = (
+        f"{CACHE_VERSION}:{os.path.abspath(file_path)}:"
+        f"{stat.st_size}:{stat.st_mtime_ns}"
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(file_path, suffix):
+    """Location of the cache entry for file_path with the given suffix"""
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(
+        os.getcwd(), CACHE_DIR, f"{name}.{_cache_key(file_path)}{suffix}"
+    )
+
+
+def load_cached_bpm(file_path):
+    """Return the cached tempo for file_path, or None on a miss"""
+    try:
+        with open(
+            _cache_path(file_path, ".bpm.json"), encoding="utf-8"
+        ) as cache_file:
+            return float(json.load(cache_file)["tempo"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cached_bpm(file_path, tempo):
+    """Store the tempo for file_path. Failures are reported but never
+    interrupt the analysis."""
+    try:
+        cache_path = _cache_path(file_path, ".bpm.json")
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"tempo": float(tempo)}, cache_file)
+        return True
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(
+            "Warning: Could not write BPM cache for %s: %s", file_path, e
+        )
+        return False
+
+
+def load_cached_features(file_path):
+    """Return a dictionary of cached arrays for file_path (empty on a
+    miss)"""
+    try:
+        with np.load(_cache_path(file_path, ".features.npz")) as data:
+            return {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cached_features(file_path, features):
+    """Store a dictionary of arrays for file_path, replacing any
+    previous entry"""
+    try:
+        cache_path = _cache_path(file_path, ".features.npz")
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        np.savez(cache_path, **features)
+        return True
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(
+            "Warning: Could not write feature cache for %s: %s", file_path, e
+        )
+        return False
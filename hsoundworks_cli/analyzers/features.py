@@ -2,22 +2,40 @@
 
 import os
 import datetime
+import logging
+import threading
+from pathlib import Path
 import librosa
-import librosa.display
 import numpy as np
-import matplotlib.pyplot as plt
+import soundfile as sf
 
+from analyzers._fftsetup import configure_fft_backend
+from analyzers._kernels import peak_and_rms
+from analyzers.cache import load_cached_features, save_cached_features
+from analyzers.loader import load_audio, read_audio_info
 from database.manager import save_to_database, setup_database
 
+logger = logging.getLogger(__name__)
+
 # Audio analysis constants
 MFCC_COEFFICIENTS = 13
 FIGURE_WIDTH = 10
 FIGURE_HEIGHT = 4
+# Saved plot resolution; below matplotlib's default 100 for faster encoding
+PLOT_DPI = 90
 NUMPY_PRECISION = 2
 
 # Set numpy print options
 np.set_printoptions(precision=NUMPY_PRECISION, suppress=True)
 
+configure_fft_backend()
+
+# Cache entries holding spectral features, which depend on the feature rate
+_FEATURE_KEYS = ("mfccs", "chroma", "s_db")
+
+# Per-thread figure reused for every saved plot, created on first use
+_FEATURE_FIGURES = threading.local()
+
 
 def audio_file_checker(
     file_path,
@@ -26,16 +44,33 @@ def audio_file_checker(
     chroma=False,
     spectrogram=False,
     save_db=False,
+    cache=False,
+    regen_cache=False,
+    target_sr=None,
+    levels=False,
 ):
     """Analyses audio file and provides file name, sample rate
     and duration. Option to show plot graphs, mfcc graphs and chroma
-    graphs. Returns a dictionary with analysis results."""
+    graphs. With cache enabled, computed features are read from / written
+    to the analysis cache; regen_cache forces a fresh analysis. If
+    target_sr is given and lower than the file's rate, spectral features
+    are computed on a copy resampled to it; the reported sample rate and
+    duration are always the native ones. With levels set, the peak
+    level and RMS of the mono signal are reported too (cached like the
+    other features); otherwise they are None. Returns a dictionary
+    with analysis results."""
+
+    # Parse the path once; every message and plot name reuses these
+    basename = os.path.basename(file_path)
+    stem = os.path.splitext(basename)[0]
 
     # Initialize results dictionary
     results = {
-        "filename": os.path.basename(file_path),
+        "filename": basename,
         "sample_rate": None,
         "duration_seconds": None,
+        "peak": None,
+        "rms": None,
         "mfcc_calculated": False,
         "chroma_calculated": False,
         "spectrogram_calculated": False,
@@ -44,70 +79,138 @@ def audio_file_checker(
 
     # Validate file existence
     if not os.path.isfile(file_path):
-        print(f"Error: File does not exist: {file_path}")
+        logger.error("Error: File does not exist: %s", file_path)
         return None
 
     # Check file permissions
     if not os.access(file_path, os.R_OK):
-        print(f"Error: No read permission for file: {file_path}")
+        logger.error("Error: No read permission for file: %s", file_path)
         return None
 
-    try:
-        # Load the audio
-        y, sr = librosa.load(file_path, sr=None, mono=False)
+    cached = {}
+    if cache and not regen_cache:
+        cached = load_cached_features(file_path)
+    computed = {}
+
+    # Cached features only count if computed at the rate this call would
+    # use; entries without a feature rate were computed at the native one
+    if "sample_rate" in cached:
+        native_sr = int(cached["sample_rate"])
+        cached_feature_sr = int(cached.get("feature_sample_rate", native_sr))
+        if cached_feature_sr != _feature_rate(native_sr, target_sr):
+            cached = {
+                key: value
+                for key, value in cached.items()
+                if key not in _FEATURE_KEYS
+            }
+
+    # Only decode when the cache can't answer everything requested
+    requested = [
+        key
+        for key, wanted in (
+            ("mfccs", mfcc),
+            ("chroma", chroma),
+            ("s_db", spectrogram),
+            ("peak", levels),
+        )
+        if wanted
+    ]
+    # With nothing to plot or compute, sample rate and duration come
+    # straight from the file header; None means fall back to a decode
+    info = None
+    if not plot and not requested and "sample_rate" not in cached:
+        info = read_audio_info(file_path)
+
+    needs_audio = info is None and (
+        plot
+        or "sample_rate" not in cached
+        or any(key not in cached for key in requested)
+    )
+
+    y = None
+    if needs_audio:
+        try:
+            # Load the audio (downmixed to mono)
+            y, sr = load_audio(file_path)
 
-        if y is None or (hasattr(y, "size") and y.size == 0):
-            print(f"Error: Could not load audio data from file: {file_path}")
-            return None
+            if y is None or (hasattr(y, "size") and y.size == 0):
+                logger.error(
+                    "Error: Could not load audio data from file: %s", file_path
+                )
+                return None
 
-    except librosa.LibrosaError as e:
-        print(f"Librosa error loading {file_path}: {e}")
-        return None
-    except FileNotFoundError:
-        print(f"Error: File not found during loading: {file_path}")
-        return None
-    except (ValueError, TypeError) as e:
-        print(f"Data validation error loading {file_path}: {e}")
-        return None
-    except MemoryError:
-        print(f"Memory error: File too large to process: {file_path}")
-        return None
+        except librosa.LibrosaError as e:
+            logger.error("Librosa error loading %s: %s", file_path, e)
+            return None
+        except sf.SoundFileError as e:
+            logger.error("SoundFile error loading %s: %s", file_path, e)
+            return None
+        except FileNotFoundError:
+            logger.error("Error: File not found during loading: %s", file_path)
+            return None
+        except (ValueError, TypeError) as e:
+            logger.error("Data validation error loading %s: %s", file_path, e)
+            return None
+        except MemoryError:
+            logger.error(
+                "Memory error: File too large to process: %s", file_path
+            )
+            return None
 
-    try:
-        output_dir = os.path.join(os.getcwd(), "outputs")
-        os.makedirs(output_dir, exist_ok=True)
-    except OSError as e:
-        print(f"Error creating output directory: {e}")
-        return None
+    # Created by _save_figure when the first plot is written
+    output_dir = Path.cwd() / "outputs"
 
     try:
-        # Work out the duration
-        duration = librosa.get_duration(y=y, sr=sr)
+        if info is not None:
+            sr = info.samplerate
+            duration = info.duration
+        elif y is None:
+            sr = int(cached["sample_rate"])
+            duration = float(cached["duration_seconds"])
+        else:
+            # Work out the duration straight from the sample count
+            duration = y.shape[-1] / float(sr)
 
         if duration <= 0:
-            print(
-                f"Error: Invalid duration ({duration}s) for file: {file_path}"
+            logger.error(
+                "Error: Invalid duration (%ss) for file: %s",
+                duration,
+                file_path,
             )
             return None
 
-        # If stereo, average the channels to make it mono
-        if y.ndim > 1:
-            y = np.mean(y, axis=0)
-
         # Populate results dictionary
         results["sample_rate"] = sr
         results["duration_seconds"] = float(duration)
+        computed["sample_rate"] = sr
+        computed["duration_seconds"] = float(duration)
 
         # Print core info
-        print(f"\nFile: {os.path.basename(file_path)}")
-        print(f"Sample Rate: {sr} Hz")
-        print(f"Duration: {datetime.timedelta(seconds=round(duration))}")
+        logger.info("\nFile: %s", basename)
+        logger.info("Sample Rate: %s Hz", sr)
+        logger.info(
+            "Duration: %s", datetime.timedelta(seconds=round(duration))
+        )
+
+        if levels:
+            if "peak" in cached:
+                peak = float(cached["peak"])
+                rms = float(cached["rms"])
+            else:
+                peak, rms = _signal_levels(y)
+                computed["peak"] = peak
+                computed["rms"] = rms
+            results["peak"] = peak
+            results["rms"] = rms
+            logger.info("Peak: %.3f  RMS: %.3f", peak, rms)
 
     except (ValueError, TypeError) as e:
-        print(f"Data validation error processing audio properties: {e}")
+        logger.error(
+            "Data validation error processing audio properties: %s", e
+        )
         return None
     except MemoryError:
-        print("Memory error: Audio file too large to process")
+        logger.error("Memory error: Audio file too large to process")
         return None
 
     # Save to database
@@ -118,145 +221,265 @@ def audio_file_checker(
             save_to_database(file_path, sr, duration)
             results["saved_to_db"] = True
         except (ValueError, TypeError) as e:
-            print(f"Data validation error saving to database: {e}")
+            logger.error("Data validation error saving to database: %s", e)
             # Continue execution even if database save fails
 
     if plot:
         try:
-            plot_waveform(y, sr, title=os.path.basename(file_path))
+            plot_waveform(
+                y,
+                sr,
+                title=basename,
+                save_path=output_dir / f"{stem}_waveform.png",
+            )
         except (ValueError, TypeError, RuntimeError) as e:
-            print(f"Error creating waveform plot: {e}")
+            logger.error("Error creating waveform plot: %s", e)
+
+    # Shared power spectrogram: computed once, on first use, and reused by
+    # every spectral feature instead of each running its own STFT
+    power_spec = None
+    feature_sr = _feature_rate(sr, target_sr)
 
     if mfcc:
         try:
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=MFCC_COEFFICIENTS)
+            mfccs = cached.get("mfccs")
+            if mfccs is None:
+                if power_spec is None:
+                    power_spec = _power_spectrogram(y, sr, feature_sr)
+                    computed["feature_sample_rate"] = feature_sr
+                mel_spec = librosa.feature.melspectrogram(
+                    S=power_spec, sr=feature_sr
+                )
+                mfccs = librosa.feature.mfcc(
+                    S=librosa.power_to_db(mel_spec), n_mfcc=MFCC_COEFFICIENTS
+                )
+                computed["mfccs"] = mfccs
             results["mfcc_calculated"] = True
 
             if plot:
-                filename = os.path.splitext(os.path.basename(file_path))[0]
-                save_path = os.path.join(output_dir, f"{filename}_mfcc.png")
                 plot_features(
                     mfccs,
                     title="MFCC",
                     ylabel="MFCC Coefficients",
-                    save_path=save_path,
+                    save_path=output_dir / f"{stem}_mfcc.png",
                 )
         except librosa.LibrosaError as e:
-            print(f"Librosa error calculating MFCC: {e}")
+            logger.error("Librosa error calculating MFCC: %s", e)
         except (ValueError, TypeError, RuntimeError) as e:
-            print(f"Error processing MFCC features: {e}")
+            logger.error("Error processing MFCC features: %s", e)
         except MemoryError:
-            print(
+            logger.error(
                 "Memory error: Cannot compute MFCC features - file too large"
             )
 
     if chroma:
         try:
-            chroma_feat = librosa.feature.chroma_stft(y=y, sr=sr)
+            chroma_feat = cached.get("chroma")
+            if chroma_feat is None:
+                if power_spec is None:
+                    power_spec = _power_spectrogram(y, sr, feature_sr)
+                    computed["feature_sample_rate"] = feature_sr
+                chroma_feat = librosa.feature.chroma_stft(
+                    S=power_spec, sr=feature_sr
+                )
+                computed["chroma"] = chroma_feat
             results["chroma_calculated"] = True
 
             if plot:
-                filename = os.path.splitext(os.path.basename(file_path))[0]
-                save_path = os.path.join(output_dir, f"{filename}_chroma.png")
-
                 plot_features(
                     chroma_feat,
                     title="Chroma",
                     ylabel="Pitch Class",
-                    save_path=save_path,
+                    save_path=output_dir / f"{stem}_chroma.png",
                 )
         except librosa.LibrosaError as e:
-            print(f"Librosa error calculating Chroma: {e}")
+            logger.error("Librosa error calculating Chroma: %s", e)
         except (ValueError, TypeError, RuntimeError) as e:
-            print(f"Error processing Chroma features: {e}")
+            logger.error("Error processing Chroma features: %s", e)
         except MemoryError:
-            print(
+            logger.error(
                 "Memory error: Cannot compute Chroma features - file too large"
             )
 
     if spectrogram:
         try:
-            spectro_feat = librosa.stft(y=y)
-            s_db = librosa.amplitude_to_db(np.abs(spectro_feat), ref=np.max)
+            s_db = cached.get("s_db")
+            if s_db is None:
+                if power_spec is None:
+                    power_spec = _power_spectrogram(y, sr, feature_sr)
+                    computed["feature_sample_rate"] = feature_sr
+                s_db = librosa.power_to_db(power_spec, ref=np.max)
+                computed["s_db"] = s_db
             results["spectrogram_calculated"] = True
 
             if plot:
-                filename = os.path.splitext(os.path.basename(file_path))[0]
-                save_path = os.path.join(
-                    output_dir, f"{filename}_spectrogram.png"
-                )
-
                 plot_features(
                     s_db,
                     title="Spectrogram",
                     ylabel="Frequency",
-                    save_path=save_path,
+                    save_path=output_dir / f"{stem}_spectrogram.png",
                 )
         except librosa.LibrosaError as e:
-            print(f"Librosa error calculating Spectrogram: {e}")
+            logger.error("Librosa error calculating Spectrogram: %s", e)
         except (ValueError, TypeError, RuntimeError) as e:
-            print(f"Error processing Spectrogram features: {e}")
+            logger.error("Error processing Spectrogram features: %s", e)
         except MemoryError:
-            print("Memory error: Cannot compute Spectrogram - file too large")
+            logger.error(
+                "Memory error: Cannot compute Spectrogram - file too large"
+            )
+
+    # Persist anything new so the next run can skip the work
+    if cache and y is not None:
+        save_cached_features(file_path, {**cached, **computed})
 
     return results
 
 
-def plot_waveform(y, sr, title="Waveform"):
-    """Function that draws waveform if user types --plot"""
+def _feature_rate(sr, target_sr):
+    """Sample rate spectral features are computed at: target_sr when it
+    is set and lower than the native rate sr, otherwise sr itself"""
+    if target_sr and sr > target_sr:
+        return target_sr
+    return sr
+
+
+def _signal_levels(y):
+    """Peak absolute level and RMS of the mono signal y. The compiled
+    kernel gets both in one pass; NumPy needs one pass for each."""
+    if y.size == 0:
+        return 0.0, 0.0
+    if peak_and_rms is not None:
+        peak, rms = peak_and_rms(y)
+    else:
+        peak = np.max(np.abs(y))
+        rms = np.sqrt(np.dot(y, y) / y.size)
+    return float(peak), float(rms)
+
+
+def _power_spectrogram(y, sr, feature_sr):
+    """Power spectrogram |STFT|^2 with librosa's default frame settings,
+    matching what mfcc/chroma_stft would compute internally from y.
+    y is first resampled from sr to feature_sr when that is lower, which
+    shrinks every FFT. Squaring the real and imaginary parts avoids the
+    sqrt in np.abs and keeps the result in float32."""
+    if feature_sr < sr:
+        y = librosa.resample(
+            y, orig_sr=sr, target_sr=feature_sr, res_type="polyphase"
+        )
+    stft = librosa.stft(y=y.astype(np.float32, copy=False), dtype=np.complex64)
+    power = np.square(stft.real, dtype=np.float32)
+    power += np.square(stft.imag, dtype=np.float32)
+    return power
+
+
+def plot_waveform(y, sr, title="Waveform", save_path=None):
+    """Draws the waveform if user types --plot and saves it as a PNG to
+    save_path, or shows it in a window when no save_path is given"""
+    # pylint: disable=import-outside-toplevel
+    from librosa.display import waveshow
+
     try:
-        plt.figure(figsize=(FIGURE_WIDTH, FIGURE_HEIGHT))
-        librosa.display.waveshow(y, sr=sr)
-        plt.title(title)
-        plt.xlabel("Time (s)")
-        plt.ylabel("Amplitude")
-        plt.tight_layout()
-        plt.show()
+        fig = _new_figure(save_path)
+        ax = fig.add_subplot()
+        waveshow(y, sr=sr, ax=ax)
+        ax.set_title(title)
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Amplitude")
+        fig.tight_layout()
+        return _finish_figure(fig, save_path)
     except (ValueError, TypeError, RuntimeError) as e:
-        print(f"Error creating waveform plot '{title}': {e}")
-        plt.close()
+        logger.error("Error creating waveform plot '%s': %s", title, e)
+        return False
     except MemoryError:
-        print(f"Memory error creating waveform plot '{title}': File too large")
-        plt.close()
+        logger.error(
+            "Memory error creating waveform plot '%s': File too large", title
+        )
+        return False
+
+
+def _get_feature_figure():
+    """Return this thread's figure for saved plots, cleared of any
+    previous plot. It is built with the object-oriented Figure API on an
+    Agg canvas, so saving a plot never imports pyplot or a GUI backend
+    and works on headless machines. Each thread gets its own figure, as
+    Streamlit sessions plot concurrently on separate threads."""
+    fig = getattr(_FEATURE_FIGURES, "figure", None)
+    if fig is None:
+        # pylint: disable=import-outside-toplevel
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(FIGURE_WIDTH, FIGURE_HEIGHT))
+        FigureCanvasAgg(fig)
+        _FEATURE_FIGURES.figure = fig
+    fig.clear()
+    return fig
+
+
+def _new_figure(save_path):
+    """Figure to draw a plot on: the thread's Agg figure when saving to
+    save_path, otherwise a new pyplot figure to show interactively. Only
+    the interactive case loads pyplot."""
+    if save_path:
+        return _get_feature_figure()
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.pyplot as plt
+
+    return plt.figure(figsize=(FIGURE_WIDTH, FIGURE_HEIGHT))
+
+
+def _finish_figure(fig, save_path):
+    """Save fig to save_path, or show it and close it when not saving"""
+    if save_path:
+        return _save_figure(fig, save_path)
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.pyplot as plt
+
+    plt.show()
+    plt.close(fig)
+    return True
+
+
+def _save_figure(fig, save_path):
+    """Write fig to save_path as a PNG, creating its folder if needed.
+    The folder is checked on every save, not remembered, so one removed
+    while a long-lived process (Streamlit) runs is simply re-created;
+    a mkdir is cheap next to encoding the PNG."""
+    try:
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(save_path, dpi=PLOT_DPI)
+        logger.info("Saved plot to: %s", save_path)
+        return True
+    except OSError as e:
+        logger.error("Error saving plot to %s: %s", save_path, e)
+        return False
 
 
 def plot_features(
     feature, title="Feature", ylabel="Feature Coefficients", save_path=None
 ):
-    """Plots MFCC and Chroma graphs, and then saves them as a PNG"""
+    """Plots MFCC and Chroma graphs, and then saves them as a PNG to
+    save_path, or shows them in a window when no save_path is given"""
     try:
         if feature is None or feature.size == 0:
-            print(f"Error: No feature data to plot for '{title}'")
+            logger.error("Error: No feature data to plot for '%s'", title)
             return False
 
-        plt.figure(figsize=(FIGURE_WIDTH, FIGURE_HEIGHT))
-        plt.imshow(feature, aspect="auto", origin="lower", cmap="magma")
-        plt.title(title)
-        plt.xlabel("Time (frames)")
-        plt.ylabel(ylabel)
-        plt.colorbar(format="%+2.0f dB")
-        plt.tight_layout()
-
-        if save_path:
-            try:
-                # Ensure output directory exists
-                os.makedirs(os.path.dirname(save_path), exist_ok=True)
-                plt.savefig(save_path)
-                print(f"Saved plot to: {save_path}")
-            except OSError as e:
-                print(f"Error saving plot to {save_path}: {e}")
-                return False
-        else:
-            plt.show()
-
-        plt.close()
-        return True
+        fig = _new_figure(save_path)
+        ax = fig.add_subplot()
+        image = ax.imshow(feature, aspect="auto", origin="lower", cmap="magma")
+        ax.set_title(title)
+        ax.set_xlabel("Time (frames)")
+        ax.set_ylabel(ylabel)
+        fig.colorbar(image, ax=ax, format="%+2.0f dB")
+        fig.tight_layout()
+        return _finish_figure(fig, save_path)
 
     except (ValueError, TypeError, RuntimeError) as e:
-        print(f"Error creating feature plot '{title}': {e}")
-        plt.close()
+        logger.error("Error creating feature plot '%s': %s", title, e)
         return False
     except MemoryError:
-        print(f"Memory error creating feature plot '{title}': Data too large")
-        plt.close()
+        logger.error(
+            "Memory error creating feature plot '%s': Data too large", title
+        )
         return False
@@ -0,0 +1,87 @@
+"""Audio Loading Module"""
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from analyzers._kernels import downmix_stereo
+
+# Formats libsndfile decodes natively; anything else goes through librosa
+SOUNDFILE_EXTENSIONS = (".wav", ".flac", ".ogg")
+# Frames decoded per block when downmixing multichannel files
+LOAD_BLOCK_FRAMES = 1 << 18
+
+
+def read_audio_info(file_path):
+    """Read sample rate, frame count and duration from the file header
+    without decoding any audio. Returns the soundfile info object, or
+    None when libsndfile can't parse the header (e.g. MP3 on older
+    libsndfile builds) so callers can fall back to a full decode."""
+    try:
+        return sf.info(file_path)
+    except (sf.SoundFileError, RuntimeError):
+        return None
+
+
+def load_audio(file_path, duration=None):
+    """Load an audio file as a mono float32 signal at its native sample
+    rate. WAV/FLAC/OGG are read directly with soundfile, skipping
+    librosa's audioread and resampling machinery; other formats (MP3)
+    fall back to librosa.load. If duration is given, only the first
+    duration seconds are decoded. Returns a (y, sr) tuple; y is always
+    float32 so downstream spectral work never promotes to float64.
+    Multichannel files are decoded in blocks of LOAD_BLOCK_FRAMES and
+    downmixed into the mono output as they go, so the full interleaved
+    signal is never held in memory."""
+    if file_path.lower().endswith(SOUNDFILE_EXTENSIONS):
+        with sf.SoundFile(file_path) as audio_file:
+            sr = audio_file.samplerate
+            frames = audio_file.frames
+            if duration is not None:
+                frames = min(frames, int(duration * sr))
+
+            if audio_file.channels == 1:
+                return audio_file.read(frames, dtype="float32"), sr
+
+            mono = np.empty(frames, dtype=np.float32)
+            filled = 0
+            for block in audio_file.blocks(
+                LOAD_BLOCK_FRAMES, frames=frames, dtype="float32"
+            ):
+                end = filled + block.shape[0]
+                downmix(block, out=mono[filled:end])
+                filled = end
+        return mono[:filled], sr
+
+    return librosa.load(
+        file_path, sr=None, duration=duration, dtype=np.float32
+    )
+
+
+def downmix(y, out=None):
+    """Average a (frames, channels) signal down to mono float32, into
+    out if given. Stereo, the common case, is summed in one streaming
+    pass (a compiled Numba kernel when numba is installed) rather than
+    going through np.mean's accumulator."""
+    if y.ndim == 1:
+        if out is None:
+            return y
+        out[:] = y
+        return out
+
+    if out is None:
+        out = np.empty(y.shape[0], dtype=np.float32)
+
+    if y.shape[1] == 2:
+        if downmix_stereo is not None:
+            downmix_stereo(y[:, 0], y[:, 1], out)
+            return out
+
+        np.add(y[:, 0], y[:, 1], out=out, dtype=np.float32)
+        out *= 0.5
+        return out
+
+    # Other layouts: sum into the output and scale it in place
+    y.sum(axis=1, dtype=np.float32, out=out)
+    out *= np.float32(1.0 / y.shape[1])
+    return out
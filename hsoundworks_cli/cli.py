@@ -3,25 +3,147 @@
 features"""
 
 import argparse
+import logging
+import os
 import sys
+from functools import partial
 from pathlib import Path
-import numpy as np
 
-from analyzers.bpm import calculate_bpm, csv_writing, discover_audio_files
-from analyzers.features import audio_file_checker
-from converters.format import convert_audio
+# librosa, numpy and matplotlib are imported inside the handlers that use
+# them, so --help and the db commands start without loading them
 from database.manager import (
     setup_database,
+    save_many_to_database,
     export_to_csv,
     view_database,
     filter_loops,
 )
+from common import is_audio_file
+from parallel import chunk_size, process_pool, resolve_workers
 
 # CLI constants
-SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg")
 DEFAULT_OUTPUT_DIR = "converted_audio"
+# MFCC/chroma use little content above ~8 kHz, so analyse features here
+DEFAULT_TARGET_SR = 22050
 
-np.set_printoptions(precision=2, suppress=True)
+
+def configure_logging():
+    """Send the toolkit's log records to stdout as plain messages.
+    Records are flushed as they are written, so output from worker
+    processes isn't held back in their buffers."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(message)s", stream=sys.stdout
+    )
+
+
+def add_cache_arguments(subparser):
+    """Add the analysis cache options to an analysis subcommand."""
+    subparser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse and store BPM/feature results in outputs/cache",
+    )
+    subparser.add_argument(
+        "--regen-cache",
+        action="store_true",
+        help="Recompute results and overwrite the cache (implies --cache)",
+    )
+
+
+def add_bulk_ingest_argument(subparser):
+    """Add the fast database ingest option to a --save-db subcommand."""
+    subparser.add_argument(
+        "--bulk-ingest",
+        action="store_true",
+        help=(
+            "With --save-db, write to the database with journaling and "
+            "syncing off (for first scans of a large library)"
+        ),
+    )
+
+
+def add_workers_argument(subparser):
+    """Add the worker-process option to a file-processing subcommand."""
+    subparser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU)",
+    )
+
+
+def run_tasks(task, items, workers=None):
+    """Yield task(item) for each item, in order. Items are spread across
+    a process pool unless only one worker is needed; task must be a
+    top-level function (or a partial of one) so it can be pickled."""
+    workers = resolve_workers(workers, len(items))
+    if workers == 1:
+        yield from map(task, items)
+        return
+
+    with process_pool(workers) as executor:
+        yield from executor.map(
+            task, items, chunksize=chunk_size(len(items), workers)
+        )
+
+
+def process_batch_file(file_path, bpm=False, save_db=False, **cache_args):
+    """Analyse one file for the batch command. Runs in a worker process,
+    so nothing is written to the database here; returns the BPM (or
+    None) and the audio_file_checker results (or None) for the parent
+    to report and save. BPM decodes only its analysis window, and the
+    database results come from the file header, so neither needs a full
+    decode of the file."""
+    # pylint: disable=import-outside-toplevel
+    from analyzers.bpm import calculate_bpm
+    from analyzers.features import audio_file_checker
+
+    tempo = calculate_bpm(file_path, **cache_args) if bpm else None
+    results = None
+    if save_db:
+        results = audio_file_checker(file_path, save_db=False, **cache_args)
+    return tempo, results
+
+
+def save_results(file_paths, results_list, bulk=False):
+    """Save the sample rate and duration of each analysed file to the
+    database from the parent process, in a single transaction (or in
+    unjournaled chunks with bulk set)."""
+    setup_database()
+    save_many_to_database(
+        (
+            (file_path, results["sample_rate"], results["duration_seconds"])
+            for file_path, results in zip(file_paths, results_list)
+            if results
+        ),
+        bulk=bulk,
+    )
+
+
+def find_audio_files(folder_path, recursive=False):
+    """Return the paths of supported audio files in folder_path, in one
+    directory walk. Extensions are checked with is_audio_file, without
+    building a Path per file. A path that can't be listed (such as a
+    file) is reported and yields no files."""
+    if recursive:
+        return [
+            os.path.join(root, name)
+            for root, _, files in os.walk(folder_path)
+            for name in files
+            if is_audio_file(name)
+        ]
+
+    # scandir's DirEntry caches file type, avoiding a stat per file
+    try:
+        with os.scandir(folder_path) as entries:
+            return [
+                entry.path
+                for entry in entries
+                if is_audio_file(entry.name) and entry.is_file()
+            ]
+    except OSError as e:
+        print(f"Error: Cannot read folder {folder_path}: {e}")
+        return []
 
 
 def create_parser():
@@ -55,7 +177,9 @@ Examples:
         "--features", action="store_true", help="Extract audio features"
     )
     analyze_parser.add_argument(
-        "--plot", action="store_true", help="Show waveform plots"
+        "--plot",
+        action="store_true",
+        help="Save waveform and feature plots to outputs/",
     )
     analyze_parser.add_argument(
         "--mfcc", action="store_true", help="Extract MFCC features"
@@ -66,12 +190,29 @@ Examples:
     analyze_parser.add_argument(
         "--spectrogram", action="store_true", help="Extract spectrogram"
     )
+    analyze_parser.add_argument(
+        "--levels",
+        action="store_true",
+        help="Report each file's peak level and RMS",
+    )
+    analyze_parser.add_argument(
+        "--target-sr",
+        type=int,
+        default=DEFAULT_TARGET_SR,
+        help=(
+            "Sample rate for MFCC/chroma/spectrogram analysis "
+            f"(default: {DEFAULT_TARGET_SR}; 0 keeps the native rate)"
+        ),
+    )
     analyze_parser.add_argument(
         "--save-db", action="store_true", help="Save to database"
     )
     analyze_parser.add_argument(
         "--log", type=str, help="Save BPM results to CSV"
     )
+    add_bulk_ingest_argument(analyze_parser)
+    add_cache_arguments(analyze_parser)
+    add_workers_argument(analyze_parser)
 
     # Convert command
     convert_parser = subparsers.add_parser(
@@ -90,6 +231,7 @@ Examples:
     convert_parser.add_argument(
         "--output-dir", type=str, help="Output directory"
     )
+    add_workers_argument(convert_parser)
 
     # Database command
     db_parser = subparsers.add_parser("db", help="Database operations")
@@ -120,19 +262,31 @@ Examples:
     batch_parser.add_argument(
         "--save-db", action="store_true", help="Save all to database"
     )
+    add_bulk_ingest_argument(batch_parser)
+    add_cache_arguments(batch_parser)
+    add_workers_argument(batch_parser)
 
     return parser
 
 
 def handle_analyze(args):
     """Handle the analyze command."""
+    # pylint: disable=import-outside-toplevel
+    from analyzers.bpm import csv_writing, discover_audio_files
+    from analyzers.features import audio_file_checker
+
     folder_path = Path(args.folder_path)
     if not folder_path.exists():
         print(f"Error: Folder not found: {folder_path}")
         return
     if args.bpm:
         print("\nCalculating BPM...")
-        results = discover_audio_files(str(folder_path))
+        results = discover_audio_files(
+            str(folder_path),
+            workers=args.workers,
+            cache=args.cache,
+            regen_cache=args.regen_cache,
+        )
         if args.log:
             csv_writing(args, results)
     if (
@@ -140,23 +294,33 @@ def handle_analyze(args):
         or args.mfcc
         or args.chroma
         or args.spectrogram
+        or args.levels
         or args.save_db
     ):
         print("\nAnalyzing audio features...")
-        for file in folder_path.glob("*"):
-            if file.suffix.lower() in SUPPORTED_EXTENSIONS:
-                audio_file_checker(
-                    str(file),
-                    plot=args.plot,
-                    mfcc=args.mfcc,
-                    chroma=args.chroma,
-                    spectrogram=args.spectrogram,
-                    save_db=args.save_db,
-                )
+        audio_files = find_audio_files(folder_path)
+        task = partial(
+            audio_file_checker,
+            plot=args.plot,
+            mfcc=args.mfcc,
+            chroma=args.chroma,
+            spectrogram=args.spectrogram,
+            save_db=False,
+            cache=args.cache,
+            regen_cache=args.regen_cache,
+            target_sr=args.target_sr,
+            levels=args.levels,
+        )
+        results_list = list(run_tasks(task, audio_files, args.workers))
+        if args.save_db:
+            save_results(audio_files, results_list, bulk=args.bulk_ingest)
 
 
 def handle_convert(args):
     """Handle the convert command."""
+    # pylint: disable=import-outside-toplevel
+    from converters.format import convert_audio
+
     folder_path = Path(args.folder_path)
     output_dir = args.output_dir or DEFAULT_OUTPUT_DIR
     if not folder_path.exists():
@@ -165,9 +329,12 @@ def handle_convert(args):
     print(f"\nConverting audio files to {args.format}...")
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
-    for file in folder_path.glob("*"):
-        if file.suffix.lower() in SUPPORTED_EXTENSIONS:
-            convert_audio(str(file), str(output_path), args.format)
+    audio_files = find_audio_files(folder_path)
+    task = partial(
+        convert_audio, output_dir=str(output_path), target_format=args.format
+    )
+    for _ in run_tasks(task, audio_files, args.workers):
+        pass
 
 
 def handle_database(args):
@@ -187,36 +354,38 @@ def handle_batch(args):
     if not folder_path.exists():
         print(f"Error: Folder not found: {folder_path}")
         return
-    if args.recursive:
-        audio_files = []
-        for ext in SUPPORTED_EXTENSIONS:
-            audio_files.extend(folder_path.rglob(f"*{ext}"))
-    else:
-        audio_files = [
-            f
-            for f in folder_path.iterdir()
-            if f.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
-    print(f"\n🎵 Found {len(audio_files)} audio files")
+    file_paths = find_audio_files(folder_path, recursive=args.recursive)
+    print(f"\n🎵 Found {len(file_paths)} audio files")
+    task = partial(
+        process_batch_file,
+        bpm=args.bpm,
+        save_db=args.save_db,
+        cache=args.cache,
+        regen_cache=args.regen_cache,
+    )
+    results_list = []
+    for i, (file_path, (bpm, results)) in enumerate(
+        zip(file_paths, run_tasks(task, file_paths, args.workers)), 1
+    ):
+        name = os.path.basename(file_path)
+        print(f"\n[{i}/{len(file_paths)}] Processed: {name}")
+        if bpm:
+            print(f"  BPM: {bpm}")
+        results_list.append(results)
     if args.save_db:
-        setup_database()
-    for i, file in enumerate(audio_files, 1):
-        print(f"\n[{i}/{len(audio_files)}] Processing: {file.name}")
-        if args.bpm:
-            bpm = calculate_bpm(str(file))
-            if bpm:
-                print(f"  BPM: {bpm}")
-        if args.save_db:
-            audio_file_checker(str(file), save_db=True)
+        save_results(file_paths, results_list, bulk=args.bulk_ingest)
 
 
 def main():
     """Main entry point for the CLI."""
+    configure_logging()
     parser = create_parser()
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
         sys.exit(1)
+    if getattr(args, "regen_cache", False):
+        args.cache = True
     if args.command == "analyze":
         handle_analyze(args)
     elif args.command == "convert":
@@ -0,0 +1,13 @@
+"""Definitions Shared Across the Audio Toolkit"""
+
+# Audio file extensions handled by every tool; a frozenset makes each
+# check a single hash lookup
+AUDIO_EXTS = frozenset({".mp3", ".wav", ".flac", ".ogg"})
+
+
+def is_audio_file(name):
+    """Return True if name (a file name or path) has a supported audio
+    extension, compared case-insensitively. Only the extension is
+    lowercased, not the whole name."""
+    i = name.rfind(".")
+    return i != -1 and name[i:].lower() in AUDIO_EXTS
@@ -1,10 +1,17 @@
 """Audio Format Conversion Module"""
 
+import logging
 import os
+import shutil
 import librosa
+import numpy as np
 import soundfile as sf
 from pathlib import Path
 
+from analyzers.loader import SOUNDFILE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
 
 def convert_audio(file_path, output_dir, target_format="wav"):
     """Convert audio file to target format
@@ -22,39 +29,40 @@ def convert_audio(file_path, output_dir, target_format="wav"):
 
     # Validate input parameters
     if not file_path:
-        print("Error: File path cannot be empty")
+        logger.error("Error: File path cannot be empty")
         return False
 
     if not output_dir:
-        print("Error: Output directory cannot be empty")
+        logger.error("Error: Output directory cannot be empty")
         return False
 
     if not target_format:
-        print("Error: Target format cannot be empty")
+        logger.error("Error: Target format cannot be empty")
         return False
 
     # Validate target format
     target_format = target_format.lower().strip(".")
     if target_format not in SUPPORTED_FORMATS:
-        print(
-            f"Error: Unsupported target format '{target_format}'. "
-            f"Supported formats: {', '.join(SUPPORTED_FORMATS)}"
+        logger.error(
+            "Error: Unsupported target format '%s'. Supported formats: %s",
+            target_format,
+            ", ".join(SUPPORTED_FORMATS),
         )
         return False
 
     # Validate input file
     file_path_obj = Path(file_path)
     if not file_path_obj.exists():
-        print(f"Error: Input file does not exist: {file_path}")
+        logger.error("Error: Input file does not exist: %s", file_path)
         return False
 
     if not file_path_obj.is_file():
-        print(f"Error: Input path is not a file: {file_path}")
+        logger.error("Error: Input path is not a file: %s", file_path)
         return False
 
     # Check file permissions
     if not os.access(file_path, os.R_OK):
-        print(f"Error: No read permission for file: {file_path}")
+        logger.error("Error: No read permission for file: %s", file_path)
         return False
 
     # Validate and create output directory
@@ -62,68 +70,94 @@ def convert_audio(file_path, output_dir, target_format="wav"):
     try:
         output_dir_obj.mkdir(parents=True, exist_ok=True)
     except OSError as e:
-        print(f"Error creating output directory {output_dir}: {e}")
+        logger.error("Error creating output directory %s: %s", output_dir, e)
         return False
 
     # Check write permission for output directory
     if not os.access(output_dir, os.W_OK):
-        print(f"Error: No write permission for output directory: {output_dir}")
+        logger.error(
+            "Error: No write permission for output directory: %s", output_dir
+        )
         return False
 
     try:
-        # Load the audio file
-        y, sr = librosa.load(file_path, sr=None)
-
-        if y is None or y.size == 0:
-            print(f"Error: Could not load audio data from: {file_path}")
-            return False
-
-        if sr is None or sr <= 0:
-            print(f"Error: Invalid sample rate from file: {file_path}")
-            return False
-
         # Get filename without extension
         filename = file_path_obj.stem
+        source_format = file_path_obj.suffix.lower().lstrip(".")
 
         # Create output path
         output_path = output_dir_obj / f"{filename}.{target_format}"
 
+        # Converting a file into its own folder and format is a no-op
+        if output_path.exists() and output_path.samefile(file_path_obj):
+            logger.info(
+                "Already %s, nothing to do: %s", target_format, file_path
+            )
+            return True
+
         # Check if output file already exists and warn user
         if output_path.exists():
-            print(
-                f"Warning: Output file already exists and will be "
-                f"overwritten: {output_path}"
+            logger.warning(
+                "Warning: Output file already exists and will be "
+                "overwritten: %s",
+                output_path,
             )
 
-        # Write the converted file
-        sf.write(str(output_path), y, sr)
+        if source_format == target_format:
+            # Already in the target format: copy the bytes, no decode
+            shutil.copyfile(file_path, output_path)
+        else:
+            # Load the audio file, keeping every channel
+            if file_path_obj.suffix.lower() in SOUNDFILE_EXTENSIONS:
+                y, sr = sf.read(file_path, dtype="float32", always_2d=False)
+            else:
+                y, sr = librosa.load(
+                    file_path, sr=None, mono=False, dtype=np.float32
+                )
+                # librosa is channels-first; soundfile wants frames-first
+                y = y.T
+
+            if y is None or y.size == 0:
+                logger.error(
+                    "Error: Could not load audio data from: %s", file_path
+                )
+                return False
+
+            if sr is None or sr <= 0:
+                logger.error(
+                    "Error: Invalid sample rate from file: %s", file_path
+                )
+                return False
+
+            # Write the converted file
+            sf.write(str(output_path), y, sr)
 
         # Verify the file was written successfully
         if not output_path.exists() or output_path.stat().st_size == 0:
-            print(f"Error: Failed to write output file: {output_path}")
+            logger.error("Error: Failed to write output file: %s", output_path)
             return False
 
-        print(f"✅ Converted: {filename} → {output_path}")
+        logger.info("✅ Converted: %s → %s", filename, output_path)
         return True
 
     except librosa.LibrosaError as e:
-        print(f"Librosa error loading {file_path}: {e}")
+        logger.error("Librosa error loading %s: %s", file_path, e)
         return False
     except sf.SoundFileError as e:
-        print(f"SoundFile error writing {target_format}: {e}")
+        logger.error("SoundFile error writing %s: %s", target_format, e)
         return False
     except FileNotFoundError as e:
-        print(f"File not found during conversion: {e}")
+        logger.error("File not found during conversion: %s", e)
         return False
     except PermissionError as e:
-        print(f"Permission error during conversion: {e}")
+        logger.error("Permission error during conversion: %s", e)
         return False
     except OSError as e:
-        print(f"OS error during conversion: {e}")
+        logger.error("OS error during conversion: %s", e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error during conversion: {e}")
+        logger.error("Data validation error during conversion: %s", e)
         return False
     except MemoryError:
-        print(f"Memory error: File too large to process: {file_path}")
+        logger.error("Memory error: File too large to process: %s", file_path)
         return False
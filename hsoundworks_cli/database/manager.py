@@ -1,101 +1,248 @@
 """Database Management Module for Audio Library"""
 
+import atexit
 import sqlite3
 import csv
+import itertools
+import logging
+import os
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # Database constants
 DATABASE_NAME = "audio_library.db"
 DURATION_DECIMAL_PLACES = 1
 DEFAULT_MIN_DURATION = 3.0
+# Page cache per connection; negative values are KiB (about 20 MB)
+CACHE_SIZE_KIB = 20000
+# Rows committed per transaction when bulk ingesting
+BULK_CHUNK_ROWS = 10000
+
+# Single statement text for every insert, so the shared connection's
+# statement cache prepares it once and reuses it
+_INSERT_SQL = """
+    INSERT OR REPLACE INTO audio_files
+    (file_name, file_path, sample_rate, duration_seconds)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Layout of one row in the view and filter listings
+_ROW_FORMAT = "%-30s | %6s Hz | %6.2fs"
+# Listing rows joined into each log message; bounds memory per message
+LOG_BATCH_ROWS = 1000
+
+# Connection shared by every function in this module, opened on first use
+_CONN = None
+_CONN_PID = None
+
+
+def _get_conn():
+    """Return the module's shared connection, opening it on first use.
+    Reusing one connection keeps SQLite's page cache warm and skips
+    reopening the file and re-reading the schema on every call. A forked
+    worker process opens its own instead of using the parent's."""
+    global _CONN, _CONN_PID  # pylint: disable=global-statement
+    if _CONN is None or _CONN_PID != os.getpid():
+        _CONN = sqlite3.connect(DATABASE_NAME, check_same_thread=False)
+        # WAL with NORMAL sync avoids a full fsync of the rollback journal
+        # on every commit, and readers never block the writer
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _CONN.execute("PRAGMA synchronous=NORMAL")
+        # Keep sort/index temporaries off disk and give the page cache room
+        # for a whole library's rows
+        _CONN.execute("PRAGMA temp_store=MEMORY")
+        _CONN.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        _CONN_PID = os.getpid()
+    return _CONN
+
+
+@atexit.register
+def _close_conn():
+    """Close the shared connection when the interpreter exits"""
+    if _CONN is not None and _CONN_PID == os.getpid():
+        _CONN.close()
 
 
 def setup_database():
     """Create a simple database to store our audio analysis results"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-
-        conn.execute(
+        conn = _get_conn()
+
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS audio_files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_name TEXT NOT NULL,
+                    file_path TEXT,
+                    sample_rate INTEGER NOT NULL,
+                    duration_seconds REAL NOT NULL
+                )
             """
-            CREATE TABLE IF NOT EXISTS audio_files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_name TEXT NOT NULL,
-                sample_rate INTEGER NOT NULL,
-                duration_seconds REAL NOT NULL
             )
-        """
-        )
 
-        conn.commit()
-        print("Database setup completed successfully")
+            # Databases from before file_path get the column added; their
+            # existing rows keep a NULL path and are left untouched
+            columns = {
+                row[1]
+                for row in conn.execute("PRAGMA table_info(audio_files)")
+            }
+            if "file_path" not in columns:
+                conn.execute(
+                    "ALTER TABLE audio_files ADD COLUMN file_path TEXT"
+                )
+
+            # One row per file, so INSERT OR REPLACE updates in place. The
+            # key is the absolute path: same-named files in different
+            # folders are different files.
+            conn.execute(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_file_path
+                ON audio_files(file_path)
+            """
+            )
+            # Lets export_to_csv read rows already in ORDER BY file_name
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_file_name
+                ON audio_files(file_name)
+            """
+            )
+            # Serves both the filter and the ORDER BY in filter_loops
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_duration
+                ON audio_files(duration_seconds)
+            """
+            )
+        logger.info("Database setup completed successfully")
         return True
 
     except sqlite3.Error as e:
-        print(f"Database setup error: {e}")
+        logger.error("Database setup error: %s", e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error setting up database: {e}")
+        logger.error("Data validation error setting up database: %s", e)
         return False
-    finally:
-        if "conn" in locals():
-            conn.close()
 
 
 def save_to_database(file_path, sample_rate, duration):
     """Save the audio analysis results to our database"""
     # Validate input parameters
     if not file_path:
-        print("Error: File path cannot be empty")
+        logger.error("Error: File path cannot be empty")
         return False
 
     if not isinstance(sample_rate, (int, float)) or sample_rate <= 0:
-        print(f"Error: Invalid sample rate: {sample_rate}")
+        logger.error("Error: Invalid sample rate: %s", sample_rate)
         return False
 
     if not isinstance(duration, (int, float)) or duration <= 0:
-        print(f"Error: Invalid duration: {duration}")
+        logger.error("Error: Invalid duration: %s", duration)
         return False
 
-    # Validate file path
-    file_path_obj = Path(file_path)
-    if not file_path_obj.exists():
-        print(f"Warning: File path does not exist: {file_path}")
-        # Continue anyway as the file might have been processed and moved
+    # No existence check: callers save files they have just analysed, so
+    # a stat per row would only repeat work already done
+    file_name = os.path.basename(file_path)
+    abs_path = os.path.abspath(file_path)
 
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        
+        conn = _get_conn()
+
         # Round duration to specified decimal places before saving
         duration = round(duration, DURATION_DECIMAL_PLACES)
-        file_name = file_path_obj.name
 
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO audio_files
-            (file_name, sample_rate, duration_seconds)
-            VALUES (?, ?, ?)
-        """,
-            (file_name, int(sample_rate), duration),
-        )
-        conn.commit()
-        print(f"Saved to database: {file_name}")
+        with conn:
+            conn.execute(
+                _INSERT_SQL, (file_name, abs_path, int(sample_rate), duration)
+            )
+        logger.info("Saved to database: %s", file_name)
         return True
 
     except sqlite3.Error as e:
-        print(f"Database error saving {file_path_obj.name}: {e}")
+        logger.error("Database error saving %s: %s", file_name, e)
+        return False
+    except (ValueError, TypeError) as e:
+        logger.error("Data validation error saving to database: %s", e)
+        return False
+
+
+def save_many_to_database(rows, bulk=False):
+    """Save several (file_path, sample_rate, duration) analysis results
+    in one transaction, so a whole batch costs a single commit instead
+    of one per file. Invalid rows are reported and skipped. Returns the
+    number of rows saved, or False on a database error. With bulk set,
+    durability is traded for ingest speed (see _bulk_insert)."""
+    records = []
+    for file_path, sample_rate, duration in rows:
+        if not file_path:
+            logger.error("Error: File path cannot be empty")
+            continue
+        if not isinstance(sample_rate, (int, float)) or sample_rate <= 0:
+            logger.error("Error: Invalid sample rate: %s", sample_rate)
+            continue
+        if not isinstance(duration, (int, float)) or duration <= 0:
+            logger.error("Error: Invalid duration: %s", duration)
+            continue
+        records.append(
+            (
+                os.path.basename(file_path),
+                os.path.abspath(file_path),
+                int(sample_rate),
+                round(duration, DURATION_DECIMAL_PLACES),
+            )
+        )
+
+    if not records:
+        logger.warning("Warning: No valid results to save to database")
+        return 0
+
+    try:
+        conn = _get_conn()
+
+        if bulk:
+            _bulk_insert(conn, records)
+        else:
+            with conn:
+                conn.executemany(_INSERT_SQL, records)
+        logger.info("Saved %s file(s) to database", len(records))
+        return len(records)
+
+    except sqlite3.Error as e:
+        logger.error("Database error saving batch: %s", e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error saving to database: {e}")
+        logger.error("Data validation error saving to database: %s", e)
         return False
+
+
+def _bulk_insert(conn, records):
+    """Insert records in BULK_CHUNK_ROWS transactions with an in-memory
+    journal, no syncing and an exclusive lock, for first scans of a
+    large library. A crash mid-scan can corrupt the database, but the
+    scan can simply be rerun. WAL mode is restored afterwards."""
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+    try:
+        for start in range(0, len(records), BULK_CHUNK_ROWS):
+            with conn:
+                conn.executemany(
+                    _INSERT_SQL, records[start : start + BULK_CHUNK_ROWS]
+                )
     finally:
-        if "conn" in locals():
-            conn.close()
+        # The exclusive lock is released on the next access, which the
+        # journal_mode switch provides
+        conn.execute("PRAGMA locking_mode=NORMAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
 
 
 def export_to_csv(output_file="ah_audio_sample_library.csv"):
     """Export the database to a CSV file"""
     if not output_file:
-        print("Error: Output file name cannot be empty")
+        logger.error("Error: Output file name cannot be empty")
         return False
         
     # Validate output directory
@@ -105,11 +252,11 @@ def export_to_csv(output_file="ah_audio_sample_library.csv"):
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
     except OSError as e:
-        print(f"Error creating output directory {output_dir}: {e}")
+        logger.error("Error creating output directory %s: %s", output_dir, e)
         return False
 
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
+        conn = _get_conn()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -120,11 +267,15 @@ def export_to_csv(output_file="ah_audio_sample_library.csv"):
         """
         )
 
-        rows = cursor.fetchall()
-        if not rows:
-            print("Warning: No data found in database to export")
+        # Rows are streamed from the cursor rather than fetched up front
+        first_row = cursor.fetchone()
+        if first_row is None:
+            logger.warning("Warning: No data found in database to export")
             return False
 
+        # zip() advances the counter once per streamed row, so its next
+        # value is the total number of records written
+        row_counter = itertools.count(1)
         with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(
@@ -135,63 +286,72 @@ def export_to_csv(output_file="ah_audio_sample_library.csv"):
                 ]
             )
 
-            for row in rows:
-                writer.writerow(row)
+            writer.writerow(first_row)
+            writer.writerows(row for row, _ in zip(cursor, row_counter))
 
-        print(f"Exported {len(rows)} records to {output_file}")
+        logger.info(
+            "Exported %s records to %s", next(row_counter), output_file
+        )
         return True
 
     except sqlite3.Error as e:
-        print(f"Database error during export: {e}")
+        logger.error("Database error during export: %s", e)
         return False
     except PermissionError:
-        print(f"Error: Permission denied writing to {output_file}")
+        logger.error("Error: Permission denied writing to %s", output_file)
         return False
     except OSError as e:
-        print(f"Error writing CSV file {output_file}: {e}")
+        logger.error("Error writing CSV file %s: %s", output_file, e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error during export: {e}")
+        logger.error("Data validation error during export: %s", e)
         return False
-    finally:
-        if "conn" in locals():
-            conn.close()
+
+
+def _log_rows(rows):
+    """Log (file_name, sample_rate, duration) rows in joined messages of
+    up to LOG_BATCH_ROWS lines, rather than one record per row, while
+    still streaming from the cursor. Returns the number of rows logged."""
+    rows = iter(rows)
+    total = 0
+    while True:
+        lines = [
+            _ROW_FORMAT % row for row in itertools.islice(rows, LOG_BATCH_ROWS)
+        ]
+        if not lines:
+            return total
+        logger.info("\n".join(lines))
+        total += len(lines)
 
 
 def view_database():
     """View what's in the database"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
+        conn = _get_conn()
         cursor = conn.cursor()
 
         cursor.execute(
             "SELECT file_name, sample_rate, duration_seconds FROM audio_files"
         )
 
-        rows = cursor.fetchall()
-        if not rows:
-            print("Database is empty - no audio files found")
+        first_row = cursor.fetchone()
+        if first_row is None:
+            logger.info("Database is empty - no audio files found")
             return True
 
-        print("\nAudio Library Database:")
-        print("-" * 60)
+        logger.info("\nAudio Library Database:")
+        logger.info("-" * 60)
 
-        for row in rows:
-            name, sr, duration = row
-            print(f"{name:<30} | {sr:>6} Hz | {duration:>6.2f}s")
-
-        print(f"\nTotal files: {len(rows)}")
+        total = _log_rows(itertools.chain((first_row,), cursor))
+        logger.info("\nTotal files: %s", total)
         return True
 
     except sqlite3.Error as e:
-        print(f"Database error viewing records: {e}")
+        logger.error("Database error viewing records: %s", e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error viewing database: {e}")
+        logger.error("Data validation error viewing database: %s", e)
         return False
-    finally:
-        if "conn" in locals():
-            conn.close()
 
 
 def filter_loops(min_duration=DEFAULT_MIN_DURATION):
@@ -199,11 +359,11 @@ def filter_loops(min_duration=DEFAULT_MIN_DURATION):
     (default 3)."""
     # Validate input
     if not isinstance(min_duration, (int, float)) or min_duration < 0:
-        print(f"Error: Invalid minimum duration: {min_duration}")
+        logger.error("Error: Invalid minimum duration: %s", min_duration)
         return False
         
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
+        conn = _get_conn()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -216,26 +376,22 @@ def filter_loops(min_duration=DEFAULT_MIN_DURATION):
             (min_duration,),
         )
 
-        rows = cursor.fetchall()
-        if not rows:
-            print(f"No audio files found longer than {min_duration} seconds")
+        first_row = cursor.fetchone()
+        if first_row is None:
+            logger.info(
+                "No audio files found longer than %s seconds", min_duration
+            )
             return True
 
-        print(f"\nAudio Files longer Than {min_duration} Seconds:")
-        print("-" * 60)
-        for row in rows:
-            name, sr, duration = row
-            print(f"{name:<30} | {sr:>6} Hz | {duration:>6.2f}s")
-
-        print(f"\nFound {len(rows)} files longer than {min_duration}s")
+        logger.info("\nAudio Files longer Than %s Seconds:", min_duration)
+        logger.info("-" * 60)
+        total = _log_rows(itertools.chain((first_row,), cursor))
+        logger.info("\nFound %s files longer than %ss", total, min_duration)
         return True
 
     except sqlite3.Error as e:
-        print(f"Database error filtering records: {e}")
+        logger.error("Database error filtering records: %s", e)
         return False
     except (ValueError, TypeError) as e:
-        print(f"Data validation error filtering database: {e}")
+        logger.error("Data validation error filtering database: %s", e)
         return False
-    finally:
-        if "conn" in locals():
-            conn.close()
@@ -0,0 +1,60 @@
+"""Process Pool Helpers for Audio Batch Processing"""
+
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Parallelism comes from the process pool, so each worker's BLAS/OpenMP/
+# Numba runtime gets one thread; otherwise N workers each start N threads
+# and thrash. Only effective if this module is imported before numpy.
+for _var in (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMBA_NUM_THREADS",
+):
+    os.environ.setdefault(_var, "1")
+
+# Start method for worker processes. On Linux, "fork" lets workers inherit
+# the parent's already-imported librosa/numpy instead of re-importing them;
+# elsewhere fork is unavailable or unsafe, so fall back to "spawn".
+START_METHOD = "fork" if sys.platform.startswith("linux") else "spawn"
+
+
+def resolve_workers(workers, n_tasks):
+    """Work out how many worker processes to use for n_tasks jobs.
+    Defaults to one per CPU and never exceeds the number of tasks."""
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_tasks))
+
+
+def chunk_size(n_tasks, workers):
+    """Split n_tasks into roughly even shards, a few per worker, so
+    pickling overhead is amortised without starving idle workers."""
+    return max(1, -(-n_tasks // (workers * 4)))
+
+
+def _init_worker_logging(level):
+    """Pool initializer: log plain messages to stdout at level. Spawned
+    workers start without handlers, so their per-file messages would
+    otherwise be dropped; forked ones inherit the parent's handlers and
+    are left as they are."""
+    if level is not None and not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=level, format="%(message)s", stream=sys.stdout
+        )
+
+
+def process_pool(max_workers):
+    """Create a ProcessPoolExecutor using the toolkit's start method.
+    Workers log like the parent when it has logging configured."""
+    root = logging.getLogger()
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(START_METHOD),
+        initializer=_init_worker_logging,
+        initargs=(root.level if root.handlers else None,),
+    )
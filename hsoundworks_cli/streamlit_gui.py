@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """Streamlit GUI for Audio Toolkit"""
 
+import logging
+import os
+import sqlite3
 import streamlit as st
 from pathlib import Path
 import pandas as pd
@@ -8,10 +11,52 @@ import pandas as pd
 # Import your existing modules
 from analyzers.bpm import calculate_bpm, discover_audio_files, csv_writing
 from analyzers.features import audio_file_checker
+from common import is_audio_file
 from converters.format import convert_audio
-from database.manager import setup_database, export_to_csv
+from database.manager import (
+    DATABASE_NAME,
+    DEFAULT_MIN_DURATION,
+    setup_database,
+    save_many_to_database,
+    export_to_csv,
+)
+
+# Seconds a database query result is reused across reruns and clicks
+LIBRARY_CACHE_SECONDS = 5
+
+
+def list_audio_files(folder):
+    """Supported audio files directly inside folder, as os.DirEntry
+    objects. scandir yields names and cached file types without a stat
+    or a Path object per entry."""
+    with os.scandir(folder) as entries:
+        return [
+            entry
+            for entry in entries
+            if is_audio_file(entry.name) and entry.is_file()
+        ]
+
 
-SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg")
+@st.cache_resource
+def get_library_conn():
+    """Read-only connection to the library database, opened once and
+    reused by every rerun and session. Streamlit runs scripts on several
+    threads, hence check_same_thread=False. Writes go through
+    database.manager's own shared connection."""
+    return sqlite3.connect(
+        f"file:{DATABASE_NAME}?mode=ro", uri=True, check_same_thread=False
+    )
+
+
+@st.cache_data(ttl=LIBRARY_CACHE_SECONDS)
+def load_library_df(query, params=()):
+    """Run a query against the library database. The dataframe is cached
+    briefly, so repeated clicks and reruns skip the database entirely."""
+    return pd.read_sql_query(query, get_library_conn(), params=params)
+
+
+# Show the analysers' progress messages in the terminal running streamlit
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 st.set_page_config(page_title="Audio Toolkit", page_icon="🎵", layout="wide")
 
@@ -30,12 +75,7 @@ with tab1:
     )
 
     if folder_path and Path(folder_path).exists():
-        folder = Path(folder_path)
-        audio_files = [
-            f
-            for f in folder.glob("*")
-            if f.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
+        audio_files = list_audio_files(folder_path)
 
         if audio_files:
             st.success(f"Found {len(audio_files)} audio files:")
@@ -83,7 +123,9 @@ with tab1:
                 # BPM analysis
                 if bpm_analysis:
                     st.info("Calculating BPM...")
-                    results = discover_audio_files(folder_path)
+                    # Serial: forking a process pool from Streamlit's
+                    # multithreaded script runner isn't safe
+                    results = discover_audio_files(folder_path, workers=1)
 
                     if results:
                         df = pd.DataFrame(results, columns=["Filename", "BPM"])
@@ -110,32 +152,40 @@ with tab1:
                 ):
                     st.info("📊 Analyzing audio features...")
 
-                    folder = Path(folder_path)
-                    audio_files = [
-                        f
-                        for f in folder.glob("*")
-                        if f.suffix.lower() in SUPPORTED_EXTENSIONS
-                    ]
+                    audio_files = list_audio_files(folder_path)
 
                     progress_bar = st.progress(0)
                     feature_results = []
+                    db_rows = []
                     for i, file in enumerate(audio_files):
                         st.text(f"Processing: {file.name}")
 
                         result = audio_file_checker(
-                            str(file),
+                            os.fspath(file),
                             plot=plot_analysis,
                             mfcc=mfcc_analysis,
                             chroma=chroma_analysis,
                             spectrogram=spectrogram_analysis,
-                            save_db=save_to_db,
                         )
 
                         if result is not None:
                             feature_results.append(result)
+                            db_rows.append(
+                                (
+                                    os.fspath(file),
+                                    result["sample_rate"],
+                                    result["duration_seconds"],
+                                )
+                            )
 
                         progress_bar.progress((i + 1) / len(audio_files))
 
+                    # One transaction for the whole folder
+                    if save_to_db and db_rows:
+                        setup_database()
+                        save_many_to_database(db_rows)
+                        load_library_df.clear()
+
                     # Display feature analysis results
                     if feature_results:
                         st.subheader("Feature Analysis Results")
@@ -174,18 +224,14 @@ with tab2:
                 output_path = Path(output_dir)
                 output_path.mkdir(exist_ok=True)
 
-                audio_files = [
-                    f
-                    for f in folder_path.glob("*")
-                    if f.suffix.lower() in SUPPORTED_EXTENSIONS
-                ]
+                audio_files = list_audio_files(folder_path)
 
                 if audio_files:
                     progress_bar = st.progress(0)
                     for i, file in enumerate(audio_files):
                         st.text(f"Converting: {file.name}")
                         convert_audio(
-                            str(file), str(output_path), target_format
+                            os.fspath(file), str(output_path), target_format
                         )
                         progress_bar.progress((i + 1) / len(audio_files))
 
@@ -200,17 +246,14 @@ with tab3:
 
     with col1:
         if st.button("View Database"):
-            setup_database()
-
-            # Capture database output
-            import sqlite3
-
-            conn = sqlite3.connect("audio_library.db")
-            df = pd.read_sql_query(
-                "SELECT file_name, sample_rate, duration_seconds FROM audio_files",
-                conn,
-            )
-            conn.close()
+            try:
+                df = load_library_df(
+                    "SELECT file_name, sample_rate, duration_seconds "
+                    "FROM audio_files"
+                )
+            except (sqlite3.Error, pd.errors.DatabaseError):
+                # No database or table yet
+                df = pd.DataFrame()
 
             if not df.empty:
                 st.dataframe(df)
@@ -219,16 +262,16 @@ with tab3:
 
     with col2:
         if st.button("Filter Loops (>3s)"):
-            setup_database()
-
-            import sqlite3
-
-            conn = sqlite3.connect("audio_library.db")
-            df = pd.read_sql_query(
-                "SELECT file_name, sample_rate, duration_seconds FROM audio_files WHERE duration_seconds > 3.0 ORDER BY duration_seconds DESC",
-                conn,
-            )
-            conn.close()
+            try:
+                df = load_library_df(
+                    "SELECT file_name, sample_rate, duration_seconds "
+                    "FROM audio_files WHERE duration_seconds > ? "
+                    "ORDER BY duration_seconds DESC",
+                    (DEFAULT_MIN_DURATION,),
+                )
+            except (sqlite3.Error, pd.errors.DatabaseError):
+                # No database or table yet
+                df = pd.DataFrame()
 
             if not df.empty:
                 st.dataframe(df)
@@ -276,15 +319,14 @@ with tab4:
 
                 # Find audio files
                 if recursive:
-                    audio_files = []
-                    for ext in SUPPORTED_EXTENSIONS:
-                        audio_files.extend(folder_path.rglob(f"*{ext}"))
-                else:
+                    # One walk of the tree, filtered by suffix
                     audio_files = [
-                        f
-                        for f in folder_path.iterdir()
-                        if f.suffix.lower() in SUPPORTED_EXTENSIONS
+                        path
+                        for path in folder_path.rglob("*")
+                        if is_audio_file(path.name) and path.is_file()
                     ]
+                else:
+                    audio_files = list_audio_files(folder_path)
 
                 st.info(f"🎵 Found {len(audio_files)} audio files")
 
@@ -294,6 +336,7 @@ with tab4:
                 if audio_files:
                     progress_bar = st.progress(0)
                     results = []
+                    db_rows = []
 
                     for i, file in enumerate(audio_files):
                         st.text(
@@ -302,15 +345,28 @@ with tab4:
                         )
 
                         if batch_bpm:
-                            bpm = calculate_bpm(str(file))
+                            bpm = calculate_bpm(os.fspath(file))
                             if bpm:
                                 results.append({"File": file.name, "BPM": bpm})
 
                         if batch_save_db:
-                            audio_file_checker(str(file), save_db=True)
+                            info = audio_file_checker(os.fspath(file))
+                            if info is not None:
+                                db_rows.append(
+                                    (
+                                        os.fspath(file),
+                                        info["sample_rate"],
+                                        info["duration_seconds"],
+                                    )
+                                )
 
                         progress_bar.progress((i + 1) / len(audio_files))
 
+                    # One transaction for the whole library
+                    if db_rows:
+                        save_many_to_database(db_rows)
+                        load_library_df.clear()
+
                     if results:
                         st.subheader("BPM Results")
                         df = pd.DataFrame(results)
@@ -5,11 +5,14 @@ setup(
     version='0.1',
     packages=find_packages(),
     install_requires=[
-        'librosa',
+        'librosa>=0.10',
         'matplotlib',
         'numpy',
         'soundfile'  # Add this if you're doing audio conversion
     ],
+    extras_require={
+        'fftw': ['pyfftw'],  # Faster repeated FFTs for feature analysis
+    },
     entry_points={
         'console_scripts': [
             'hscheck = hsoundworks_cli.main:main',